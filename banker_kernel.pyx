@@ -0,0 +1,87 @@
+# cython: language_level=3
+"""Compiled Banker's Algorithm safety check used by bankeralgodeadlock when it is built.
+
+Build it in place with `cythonize -i banker_kernel.pyx`.
+"""
+cimport cython
+from libc.stdlib cimport calloc, free
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t _is_safe(const int[:, ::1] need, const int[:, ::1] allocation, int *work,
+                         Py_ssize_t thread_id, const int[::1] request, unsigned char *finish,
+                         Py_ssize_t *blocking, Py_ssize_t *safe_sequence) noexcept nogil:
+    """Run the safety scan and return how many threads could finish (all of them iff safe)."""
+    cdef Py_ssize_t num_threads = need.shape[0]
+    cdef Py_ssize_t num_resources = need.shape[1]
+    cdef Py_ssize_t count = 0
+    cdef Py_ssize_t i, j, b
+    cdef int granted
+    cdef bint ready, progress
+
+    if thread_id >= 0:
+        for j in range(num_resources):
+            work[j] -= request[j]
+
+    while count < num_threads:
+        progress = False
+        for i in range(num_threads):
+            if finish[i]:
+                continue
+            granted = 1 if i == thread_id else 0
+            # Work only grows, so the thread stays blocked until that resource catches up
+            b = blocking[i]
+            if need[i, b] - granted * request[b] > work[b]:
+                continue
+            ready = True
+            for j in range(num_resources):
+                if need[i, j] - granted * request[j] > work[j]:
+                    blocking[i] = j
+                    ready = False
+                    break
+            if ready:
+                safe_sequence[count] = i
+                count += 1
+                finish[i] = 1
+                for j in range(num_resources):
+                    work[j] += allocation[i, j] + granted * request[j]
+                progress = True
+                break
+
+        if not progress:
+            break
+
+    return count
+
+
+def is_safe_kernel(const int[:, ::1] need, const int[:, ::1] allocation, const int[::1] available,
+                   Py_ssize_t thread_id, const int[::1] request):
+    """Same check as bankeralgodeadlock._is_safe_kernel for C-contiguous int32 arrays, returning (safe, safe_sequence)."""
+    cdef Py_ssize_t num_threads = need.shape[0]
+    cdef Py_ssize_t num_resources = need.shape[1]
+    cdef Py_ssize_t j, count
+
+    # Scratch state lives in C buffers, only the sequence goes back to Python
+    cdef int *work = <int *> calloc(num_resources, sizeof(int))
+    cdef unsigned char *finish = <unsigned char *> calloc(num_threads, sizeof(unsigned char))
+    cdef Py_ssize_t *blocking = <Py_ssize_t *> calloc(num_threads, sizeof(Py_ssize_t))
+    cdef Py_ssize_t *safe_sequence = <Py_ssize_t *> calloc(num_threads, sizeof(Py_ssize_t))
+    if work == NULL or finish == NULL or blocking == NULL or safe_sequence == NULL:
+        free(work)
+        free(finish)
+        free(blocking)
+        free(safe_sequence)
+        raise MemoryError()
+
+    try:
+        with nogil:
+            for j in range(num_resources):
+                work[j] = available[j]
+            count = _is_safe(need, allocation, work, thread_id, request, finish, blocking, safe_sequence)
+        return count == num_threads, [safe_sequence[j] for j in range(count)]
+    finally:
+        free(work)
+        free(finish)
+        free(blocking)
+        free(safe_sequence)
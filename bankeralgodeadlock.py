@@ -1,116 +1,305 @@
+import functools
+import heapq
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # Numba is optional, is_safe falls back to the pure Python paths
+    numba = None
+
+try:
+    import banker_kernel
+except ImportError:  # The Cython kernel is optional too, see banker_kernel.pyx for building it
+    banker_kernel = None
+
+# Largest thread/resource counts for which is_safe gets a generated, fully unrolled scan
+SPECIALIZE_MAX = 16
+
+
+def _is_safe_kernel(need, allocation, available, thread_id, request):
+    """Banker's safety check over int32 arrays, returning (safe, sequence buffer, sequence length).
+
+    The state is checked as if thread_id had also been granted request, without modifying the
+    arrays; thread_id -1 checks the state as it is.
+    """
+    num_threads, num_resources = need.shape
+    work = available.copy()
+    if thread_id >= 0:
+        work -= request
+    finish = np.zeros(num_threads, dtype=np.bool_)
+    blocking = np.zeros(num_threads, dtype=np.int64)  # Resource that last stopped each thread
+    safe_sequence = np.empty(num_threads, dtype=np.int64)
+    count = 0
+
+    while count < num_threads:
+        progress = False
+        for i in range(num_threads):
+            if finish[i]:
+                continue
+            granted = 1 if i == thread_id else 0
+            # Work only grows, so the thread stays blocked until that resource catches up
+            b = blocking[i]
+            if need[i, b] - granted * request[b] > work[b]:
+                continue
+            ready = True
+            for j in range(num_resources):
+                if need[i, j] - granted * request[j] > work[j]:
+                    blocking[i] = j
+                    ready = False
+                    break
+            if ready:
+                safe_sequence[count] = i
+                count += 1
+                finish[i] = True
+                for j in range(num_resources):
+                    work[j] += allocation[i, j] + granted * request[j]
+                progress = True
+                break
+
+        if not progress:
+            return False, safe_sequence, count
+
+    return True, safe_sequence, count
+
+
+if numba is not None:
+    _is_safe_kernel = numba.njit(cache=True, boundscheck=False)(_is_safe_kernel)
+
+
+@functools.lru_cache(maxsize=None)
+def specialize_is_safe(num_threads, num_resources):
+    """Generate is_safe with the scan unrolled for a fixed shape, or None if the shape is too large.
+
+    The generated function takes need/allocation/available as nested lists and keeps every
+    cell in a local variable, so the scan runs without loop or indexing overhead.
+    """
+    if not (0 < num_threads <= SPECIALIZE_MAX and 0 < num_resources <= SPECIALIZE_MAX):
+        return None
+
+    threads = range(num_threads)
+    resources = range(num_resources)
+
+    def row(name, i):
+        return "(" + "".join(f"{name}{i}_{j}, " for j in resources) + ")"
+
+    lines = [
+        "def is_safe(need, allocation, available):",
+        "    " + "".join(row("n", i) + ", " for i in threads) + "= need",
+        "    " + "".join(row("a", i) + ", " for i in threads) + "= allocation",
+        "    " + "".join(f"w{j}, " for j in resources) + "= available",
+        "    " + " = ".join(f"f{i}" for i in threads) + " = False",
+        "    safe_sequence = []",
+        # Every pass either finishes one thread or proves the state unsafe
+        f"    for _ in range({num_threads}):",
+    ]
+    for i in threads:
+        ready = " and ".join(f"n{i}_{j} <= w{j}" for j in resources)
+        lines += [
+            f"        {'if' if i == 0 else 'elif'} not f{i} and {ready}:",
+            f"            f{i} = True",
+            f"            safe_sequence.append({i})",
+        ]
+        lines += [f"            w{j} += a{i}_{j}" for j in resources]
+    lines += [
+        "        else:",
+        "            return False, safe_sequence",
+        "    return True, safe_sequence",
+    ]
+
+    namespace = {}
+    exec(compile("\n".join(lines), f"<is_safe {num_threads}x{num_resources}>", "exec"), namespace)
+    return namespace["is_safe"]
 
 class BankersAlgorithm:
     def __init__(self, num_resources, num_threads):
         self.num_resources = num_resources
         self.num_threads = num_threads
-        self.available = [3] * num_resources  # Available resources
-        self.max = [[7, 5, 3], [3, 2, 2], [9, 0, 2]]  # Maximum resources needed by each thread
-        self.allocation = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]  # Resources currently allocated
+        self.available = np.full(num_resources, 3, dtype=np.int32)  # Available resources
+        self.max = np.array([[7, 5, 3], [3, 2, 2], [9, 0, 2]], dtype=np.int32)[:num_threads, :num_resources]  # Maximum resources needed by each thread
+        self.allocation = np.zeros((num_threads, num_resources), dtype=np.int32)  # Resources currently allocated
         self.need = self.calculate_need()  # Remaining needs of resources
+        self._is_safe_specialized = specialize_is_safe(num_threads, num_resources)
+        self._no_request = np.zeros(num_resources, dtype=np.int32)  # Delta passed when checking the state as it is
+        self._lock = threading.Lock()  # Guards available/allocation/need across request and release
 
     def calculate_need(self):
         """Calculate remaining resource needs (Max - Allocation)."""
-        need = []
-        for i in range(self.num_threads):
-            row = [self.max[i][j] - self.allocation[i][j] for j in range(self.num_resources)]
-            need.append(row)
-        return need
+        return self.max - self.allocation
 
-    def is_safe(self):
-        """Check if the system is in a safe state using the Banker's Algorithm."""
-        work = self.available[:]  # Work is a copy of available resources
+    def is_safe_scan(self, need, allocation, available):
+        """Banker's safety check as a plain front-to-back scan over the threads."""
+        need, allocation = need.tolist(), allocation.tolist()
+        work = available.tolist()  # Work is a copy of available resources
         finish = [False] * self.num_threads  # Track finished threads
         safe_sequence = []
 
         while len(safe_sequence) < self.num_threads:
             progress = False
             for i in range(self.num_threads):
-                if not finish[i] and all(self.need[i][j] <= work[j] for j in range(self.num_resources)):
-                    # This thread can finish because its needs are less than or equal to available resources
+                if not finish[i] and all(n <= w for n, w in zip(need[i], work)):
                     safe_sequence.append(i)
                     finish[i] = True
                     # Simulate the thread releasing its resources
-                    for j in range(self.num_resources):
-                        work[j] += self.allocation[i][j]
+                    work = [w + a for w, a in zip(work, allocation[i])]
                     progress = True
                     break
 
             if not progress:
-                # If no thread can progress, then the system is not in a safe state
                 return False, safe_sequence
 
         return True, safe_sequence
 
+    def is_safe_heap(self, need, allocation, available):
+        """Banker's safety check driven by per-resource heaps of need."""
+        if allocation.min(initial=0) < 0:
+            # An over-release leaves negative allocation, so work can shrink and popped entries go stale
+            return self.is_safe_scan(need, allocation, available)
+
+        allocation = allocation.tolist()
+        work = available.tolist()  # Work is a copy of available resources
+
+        # Per-resource min-heaps of (need, thread) for threads still short of that resource;
+        # since work only grows, entries are popped as soon as work catches up with them
+        short = need > available
+        heaps = []
+        for j in range(self.num_resources):
+            waiting = np.flatnonzero(short[:, j])
+            heap = list(zip(need[waiting, j].tolist(), waiting.tolist()))
+            heapq.heapify(heap)
+            heaps.append(heap)
+        blocked = short.sum(axis=1)  # Number of resources each thread is still short of
+
+        # Always run the lowest-numbered ready thread, matching a front-to-back scan
+        ready = np.flatnonzero(blocked == 0).tolist()
+        blocked = blocked.tolist()
+        safe_sequence = []
+
+        while ready:
+            i = heapq.heappop(ready)
+            safe_sequence.append(i)
+            # Simulate the thread releasing its resources
+            for j in range(self.num_resources):
+                if not allocation[i][j]:
+                    continue
+                work[j] += allocation[i][j]
+                heap = heaps[j]
+                while heap and heap[0][0] <= work[j]:
+                    _, k = heapq.heappop(heap)
+                    blocked[k] -= 1
+                    if blocked[k] == 0:
+                        heapq.heappush(ready, k)
+
+        # If some thread never became ready, the system is not in a safe state
+        return len(safe_sequence) == self.num_threads, safe_sequence
+
+    def is_safe(self):
+        """Check if the system is in a safe state using the Banker's Algorithm."""
+        return self._is_safe_with_delta(-1, self._no_request)
+
+    def _is_safe_with_delta(self, thread_id, request):
+        """Check if granting request to thread_id would leave a safe state, without applying it.
+
+        thread_id -1 checks the current state.
+        """
+        if numba is not None:
+            safe, safe_sequence, count = _is_safe_kernel(self.need, self.allocation, self.available, thread_id, request)
+            return bool(safe), safe_sequence[:count].tolist()
+
+        if banker_kernel is not None:
+            try:
+                return banker_kernel.is_safe_kernel(self.need, self.allocation, self.available, thread_id, request)
+            except ValueError:
+                pass  # Its typed memoryviews only take C-contiguous int32 arrays, check the others below
+
+        if self._is_safe_specialized is not None:
+            need, allocation, available = self.need.tolist(), self.allocation.tolist(), self.available.tolist()
+            if thread_id >= 0:
+                delta = request.tolist()
+                need[thread_id] = [n - d for n, d in zip(need[thread_id], delta)]
+                allocation[thread_id] = [a + d for a, d in zip(allocation[thread_id], delta)]
+                available = [w - d for w, d in zip(available, delta)]
+            return self._is_safe_specialized(need, allocation, available)
+
+        # The heap check copies its inputs anyway, so hand it the candidate state
+        need, allocation, available = self.need, self.allocation, self.available
+        if thread_id >= 0:
+            need = need.copy()
+            need[thread_id] -= request
+            allocation = allocation.copy()
+            allocation[thread_id] += request
+            available = available - request
+
+        return self.is_safe_heap(need, allocation, available)
+
     def request_resources(self, thread_id, request):
         """Request resources for a thread."""
-        # Check if the request is valid (i.e., not exceeding the need)
-        if any(request[i] > self.need[thread_id][i] for i in range(self.num_resources)):
-            print(f"Thread {thread_id} made an invalid request.")
-            return False
-
-        # Check if resources are available
-        if any(request[i] > self.available[i] for i in range(self.num_resources)):
-            print(f"Thread {thread_id} is waiting for resources.")
-            return False
-
-        # Pretend to allocate resources and check if the system remains in a safe state
-        original_available = self.available[:]
-        original_allocation = self.allocation[:]
-        original_need = self.need[:]
-
-        # Allocate resources
-        for i in range(self.num_resources):
-            self.available[i] -= request[i]
-            self.allocation[thread_id][i] += request[i]
-            self.need[thread_id][i] -= request[i]
-
-        safe, safe_sequence = self.is_safe()
-
-        if not safe:
-            # Rollback allocation since it leads to an unsafe state
-            self.available = original_available
-            self.allocation = original_allocation
-            self.need = original_need
-            print(f"Thread {thread_id}'s request leads to an unsafe state, denied.")
-            return False
-
-        print(f"Thread {thread_id}'s request granted. Safe sequence: {safe_sequence}")
-        return True
+        request = np.asarray(request, dtype=np.int32)
+        with self._lock:
+            # Check if the request is valid (i.e., not exceeding the need)
+            if (request > self.need[thread_id]).any():
+                print(f"Thread {thread_id} made an invalid request.")
+                return False
+
+            # Check if resources are available
+            if (request > self.available).any():
+                print(f"Thread {thread_id} is waiting for resources.")
+                return False
+
+            # Check if the system would remain in a safe state before touching it, so there is nothing to roll back
+            safe, safe_sequence = self._is_safe_with_delta(thread_id, request)
+
+            if not safe:
+                print(f"Thread {thread_id}'s request leads to an unsafe state, denied.")
+                return False
+
+            # Allocate resources
+            self.available -= request
+            self.allocation[thread_id] += request
+            self.need[thread_id] -= request
+
+            print(f"Thread {thread_id}'s request granted. Safe sequence: {safe_sequence}")
+            return True
 
     def release_resources(self, thread_id, release):
         """Release resources held by a thread."""
-        for i in range(self.num_resources):
-            self.available[i] += release[i]
-            self.allocation[thread_id][i] -= release[i]
-            self.need[thread_id][i] += release[i]
-        print(f"Thread {thread_id} released resources: {release}.")
+        delta = np.asarray(release, dtype=np.int32)
+        with self._lock:
+            self.available += delta
+            self.allocation[thread_id] -= delta
+            self.need[thread_id] += delta
+            print(f"Thread {thread_id} released resources: {release}.")
 
 # Example Usage:
-def example_thread_work(thread_id, banker):
-    """Simulate some work where threads request resources."""
+def example_thread_work(thread_id, banker, work_delay=2):
+    """Simulate some work where threads request resources.
+
+    work_delay is how long the thread holds its resources; pass 0 to time only the algorithm.
+    """
     print(f"Thread {thread_id} started working.")
     
     # Request resources for this thread
     request = [1, 0, 2]  # Example request (can be changed based on resources)
     if banker.request_resources(thread_id, request):
-        time.sleep(2)
+        time.sleep(work_delay)
         # After doing some work, release resources
         banker.release_resources(thread_id, request)
     else:
         print(f"Thread {thread_id} could not get resources.")
 
-# Create Banker's Algorithm for 3 resources and 3 threads
-banker = BankersAlgorithm(num_resources=3, num_threads=3)
+if __name__ == "__main__":
+    # Create Banker's Algorithm for 3 resources and 3 threads
+    banker = BankersAlgorithm(num_resources=3, num_threads=3)
 
-# Creating threads
-threads = []
-for i in range(3):
-    t = threading.Thread(target=example_thread_work, args=(i, banker))
-    threads.append(t)
-    t.start()
+    # Running the simulated threads on a pool so worker threads are reused
+    executor = ThreadPoolExecutor(max_workers=banker.num_threads)
+    futures = [executor.submit(example_thread_work, i, banker) for i in range(3)]
 
-# Wait for threads to finish
-for t in threads:
-    t.join()
+    # Wait for threads to finish
+    wait(futures)
+    executor.shutdown()
+    for future in futures:
+        future.result()  # Re-raise anything a simulated thread failed with
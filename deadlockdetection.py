@@ -1,101 +1,236 @@
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+
+# Up to this many threads check_deadlock uses a dense wait-for matrix and its transitive closure
+DENSE_MAX_THREADS = 64
+
+
+def iter_bits(mask):
+    """Yield the indices of the set bits of an int bitmask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
 
 class DeadlockDetector:
     def __init__(self, num_resources, num_threads):
         self.num_resources = num_resources
         self.num_threads = num_threads
-        self.resource_status = [None] * num_resources  # None if resource is free
-        self.thread_locks = [None] * num_threads  # Tracks lock each thread is holding
-        self.waiting_threads = {i: set() for i in range(num_threads)}  # Threads waiting for a resource
+        self.resource_status = np.full(num_resources, -1, dtype=np.int32)  # -1 if resource is free
+        self.thread_locks = np.full(num_threads, -1, dtype=np.int32)  # Tracks lock each thread is holding, -1 if none
+        self.waiting_mask = {i: 0 for i in range(num_threads)}  # Bitmask of resources each thread is waiting for
+        self.waits_for = {i: 0 for i in range(num_threads)}  # Wait-for graph: bitmask of threads each thread is waiting on
+        self.deadlock_found = False  # Set when adding a wait-for edge closes a cycle
+        self._cv = threading.Condition()  # Guards the state above, notified whenever it changes
 
     def request_resource(self, thread_id, resource_id):
         """Request a resource for a thread."""
-        if self.resource_status[resource_id] is None:
-            self.resource_status[resource_id] = thread_id
-            self.thread_locks[thread_id] = resource_id
-            print(f"Thread {thread_id} acquired resource {resource_id}.")
-        else:
-            # The resource is already taken, so wait for it
-            self.waiting_threads[thread_id].add(resource_id)
-            print(f"Thread {thread_id} is waiting for resource {resource_id}.")
+        with self._cv:
+            if self.resource_status[resource_id] == -1:
+                self.resource_status[resource_id] = thread_id
+                self.thread_locks[thread_id] = resource_id
+                print(f"Thread {thread_id} acquired resource {resource_id}.")
+                self.relink_waiters(thread_id)
+            else:
+                # The resource is already taken, so wait for it
+                self.waiting_mask[thread_id] |= 1 << resource_id
+                print(f"Thread {thread_id} is waiting for resource {resource_id}.")
+                for other_thread in np.flatnonzero(self.thread_locks == resource_id).tolist():
+                    if other_thread != thread_id:
+                        self.add_wait_edge(thread_id, other_thread)
+            self._cv.notify_all()
 
     def release_resource(self, thread_id, resource_id):
         """Release a resource held by a thread."""
-        if self.thread_locks[thread_id] == resource_id:
-            self.resource_status[resource_id] = None
-            self.thread_locks[thread_id] = None
-            print(f"Thread {thread_id} released resource {resource_id}.")
+        with self._cv:
+            if self.thread_locks[thread_id] == resource_id:
+                self.resource_status[resource_id] = -1
+                self.thread_locks[thread_id] = -1
+                print(f"Thread {thread_id} released resource {resource_id}.")
+                self.relink_waiters(thread_id)
+            self._cv.notify_all()
 
-    def check_deadlock(self):
-        """Check for a cycle in the wait-for graph (deadlock)."""
-        visited = [False] * self.num_threads
-        rec_stack = [False] * self.num_threads
-
-        def is_deadlock(thread_id):
-            visited[thread_id] = True
-            rec_stack[thread_id] = True
-
-            # Check all threads waiting on this thread
-            for resource in self.waiting_threads[thread_id]:
-                for other_thread, other_resource in enumerate(self.thread_locks):
-                    if other_thread != thread_id and other_resource == resource:
-                        # Thread `other_thread` is holding the resource, so this thread is waiting
-                        if not visited[other_thread] and is_deadlock(other_thread):
-                            return True
-                        elif rec_stack[other_thread]:
-                            return True
-
-            rec_stack[thread_id] = False
-            return False
+    def relink_waiters(self, holder):
+        """Update the wait-for edges into a thread after the lock it holds changed."""
+        resource = int(self.thread_locks[holder])
+        for thread_id, mask in self.waiting_mask.items():
+            if thread_id == holder:
+                continue
+            if resource != -1 and (mask >> resource) & 1:
+                self.add_wait_edge(thread_id, holder)
+            else:
+                self.waits_for[thread_id] &= ~(1 << holder)
+
+    def add_wait_edge(self, thread_id, other_thread):
+        """Record that a thread waits on another and check whether that closes a cycle."""
+        if (self.waits_for[thread_id] >> other_thread) & 1:
+            return
+        self.waits_for[thread_id] |= 1 << other_thread
+        if self.has_path(other_thread, thread_id):
+            print(f"Deadlock detected: thread {thread_id} closes a wait cycle through thread {other_thread}.")
+            self.deadlock_found = True
 
-        for thread_id in range(self.num_threads):
-            if not visited[thread_id] and is_deadlock(thread_id):
-                print(f"Deadlock detected in thread {thread_id}.")
+    def has_path(self, start, target):
+        """Check if target is reachable from start in the wait-for graph."""
+        # Expand a frontier of threads one wait-for step at a time
+        visited = frontier = 1 << start
+        while frontier:
+            reach = 0
+            for thread_id in iter_bits(frontier):
+                reach |= self.waits_for[thread_id]
+            if (reach >> target) & 1:
                 return True
+            frontier = reach & ~visited
+            visited |= frontier
         return False
 
+    def wait_edges(self):
+        """Build the wait-for edges (waiting thread, holding thread) from the current lock state."""
+        # Each resource has at most one thread whose current lock it is, so invert thread_locks once
+        holders = np.flatnonzero(self.thread_locks != -1)
+        resource_to_holder = np.full(self.num_resources, -1, dtype=np.int32)
+        resource_to_holder[self.thread_locks[holders]] = holders
+
+        waiters, resources = [], []
+        for thread_id, mask in self.waiting_mask.items():
+            for resource in iter_bits(mask):
+                waiters.append(thread_id)
+                resources.append(resource)
+        src = np.array(waiters, dtype=np.int32)
+        dst = resource_to_holder[np.array(resources, dtype=np.intp)]
+        keep = (dst != -1) & (dst != src)
+        return src[keep], dst[keep]
+
+    def check_deadlock(self):
+        """Check for a cycle in the wait-for graph (deadlock)."""
+        with self._cv:
+            # Rebuild the graph from the lock state in one pass rather than trusting the incremental edges
+            src, dst = self.wait_edges()
+
+            if self.num_threads <= DENSE_MAX_THREADS:
+                # Square the reachability matrix until it covers paths as long as the number of threads;
+                # a thread that can reach itself is on a cycle
+                reach = np.zeros((self.num_threads, self.num_threads), dtype=np.bool_)
+                reach[src, dst] = True
+                for _ in range(max(self.num_threads - 1, 1).bit_length()):
+                    steps = reach.astype(np.float32)
+                    reach |= (steps @ steps) > 0
+                on_cycle = np.flatnonzero(np.diagonal(reach))
+                if on_cycle.size:
+                    print(f"Deadlock detected in thread {on_cycle[0]}.")
+                    return True
+                return False
+
+            # Otherwise pack the edges as sorted (waiting << shift) | holding keys so each thread's out-edges are one run
+            shift = max(self.num_threads - 1, 1).bit_length()
+            dtype = np.int32 if 2 * shift < 32 else np.int64
+            keys = np.unique((src.astype(dtype) << shift) | dst.astype(dtype))
+            bounds = np.searchsorted(keys, np.arange(self.num_threads + 1, dtype=dtype) << shift).tolist()
+            targets = (keys & ((1 << shift) - 1)).tolist()
+
+            def waits_for(thread_id):
+                return iter(targets[bounds[thread_id]:bounds[thread_id + 1]])
+
+            # Iterative Tarjan SCC: any component with more than one thread is a cycle of waits
+            index = [-1] * self.num_threads
+            lowlink = [0] * self.num_threads
+            on_stack = [False] * self.num_threads
+            stack = []
+            counter = 0
+
+            for root in range(self.num_threads):
+                if index[root] != -1:
+                    continue
+                index[root] = lowlink[root] = counter
+                counter += 1
+                stack.append(root)
+                on_stack[root] = True
+                work = [(root, waits_for(root))]
+
+                while work:
+                    thread_id, edges = work[-1]
+                    for other_thread in edges:
+                        if index[other_thread] == -1:
+                            index[other_thread] = lowlink[other_thread] = counter
+                            counter += 1
+                            stack.append(other_thread)
+                            on_stack[other_thread] = True
+                            work.append((other_thread, waits_for(other_thread)))
+                            break
+                        if on_stack[other_thread]:
+                            lowlink[thread_id] = min(lowlink[thread_id], index[other_thread])
+                    else:
+                        work.pop()
+                        if work:
+                            parent = work[-1][0]
+                            lowlink[parent] = min(lowlink[parent], lowlink[thread_id])
+                        if lowlink[thread_id] == index[thread_id]:
+                            component = []
+                            while True:
+                                other_thread = stack.pop()
+                                on_stack[other_thread] = False
+                                component.append(other_thread)
+                                if other_thread == thread_id:
+                                    break
+                            if len(component) > 1:
+                                print(f"Deadlock detected in thread {min(component)}.")
+                                return True
+            return False
+
     def deadlock_prevention(self, timeout=5):
         """Implement deadlock prevention by using timeouts."""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if self.check_deadlock():
-                print("Deadlock detected, attempting to prevent it by terminating a thread.")
-                # Here we will simulate the prevention by killing a thread (in real systems, we'd abort the thread or roll back)
-                for thread_id in range(self.num_threads):
-                    if self.thread_locks[thread_id] is not None:
-                        self.release_resource(thread_id, self.thread_locks[thread_id])
-                        print(f"Thread {thread_id} terminated to prevent deadlock.")
-                        break
-                return
-            time.sleep(1)  # Sleep to reduce CPU usage
+        deadline = time.time() + timeout
+        with self._cv:
+            # Sleep until request_resource/release_resource notify us instead of polling check_deadlock
+            while True:
+                if self.deadlock_found:
+                    self.deadlock_found = False
+                    if self.check_deadlock():
+                        print("Deadlock detected, attempting to prevent it by terminating a thread.")
+                        # Here we will simulate the prevention by killing a thread (in real systems, we'd abort the thread or roll back)
+                        holders = np.flatnonzero(self.thread_locks != -1)
+                        if holders.size:
+                            thread_id = int(holders[0])
+                            self.release_resource(thread_id, int(self.thread_locks[thread_id]))
+                            print(f"Thread {thread_id} terminated to prevent deadlock.")
+                        return
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return
+                self._cv.wait(remaining)
 
 # Example Usage:
-def example_thread_work(thread_id, detector):
-    """Simulate some work where threads request resources."""
+def example_thread_work(thread_id, detector, work_delay=2):
+    """Simulate some work where threads request resources.
+
+    work_delay is the pause between steps; pass 0 to time only the detector.
+    """
     print(f"Thread {thread_id} started working.")
     detector.request_resource(thread_id, 0)
-    time.sleep(2)
+    time.sleep(work_delay)
     detector.request_resource(thread_id, 1)
-    time.sleep(2)
+    time.sleep(work_delay)
     detector.release_resource(thread_id, 0)
-    time.sleep(2)
+    time.sleep(work_delay)
     detector.release_resource(thread_id, 1)
     print(f"Thread {thread_id} finished work.")
 
-# Creating detector for 3 resources and 3 threads
-detector = DeadlockDetector(num_resources=3, num_threads=3)
+if __name__ == "__main__":
+    # Creating detector for 3 resources and 3 threads
+    detector = DeadlockDetector(num_resources=3, num_threads=3)
 
-# Creating threads
-threads = []
-for i in range(3):
-    t = threading.Thread(target=example_thread_work, args=(i, detector))
-    threads.append(t)
-    t.start()
+    # Running the simulated threads on a pool so worker threads are reused
+    executor = ThreadPoolExecutor(max_workers=detector.num_threads)
+    futures = [executor.submit(example_thread_work, i, detector) for i in range(3)]
 
-# Preventing deadlock in the system with a timeout prevention strategy
-detector.deadlock_prevention(timeout=10)
+    # Preventing deadlock in the system with a timeout prevention strategy
+    detector.deadlock_prevention(timeout=10)
 
-# Waiting for threads to finish
-for t in threads:
-    t.join()
+    # Waiting for threads to finish
+    wait(futures)
+    executor.shutdown()
+    for future in futures:
+        future.result()  # Re-raise anything a simulated thread failed with
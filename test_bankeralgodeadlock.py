@@ -0,0 +1,119 @@
+import random
+import threading
+
+import numpy as np
+import pytest
+
+import bankeralgodeadlock
+from bankeralgodeadlock import BankersAlgorithm, specialize_is_safe
+
+
+def reference_is_safe(need, allocation, available):
+    """The original front-to-back scan, over nested lists."""
+    work = list(available)
+    finish = [False] * len(need)
+    safe_sequence = []
+    while len(safe_sequence) < len(need):
+        for i in range(len(need)):
+            if not finish[i] and all(n <= w for n, w in zip(need[i], work)):
+                safe_sequence.append(i)
+                finish[i] = True
+                work = [w + a for w, a in zip(work, allocation[i])]
+                break
+        else:
+            return False, safe_sequence
+    return True, safe_sequence
+
+
+def random_states(seed, count=300):
+    """Yield (need, allocation, available, thread_id, request) states, a thread_id of -1 meaning no delta.
+
+    Allocation cells go negative now and then, as release_resources allows over-releasing.
+    """
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        num_threads = int(rng.integers(1, 9))
+        num_resources = int(rng.integers(1, 6))
+        need = rng.integers(0, 6, size=(num_threads, num_resources), dtype=np.int32)
+        allocation = rng.integers(-1, 5, size=(num_threads, num_resources), dtype=np.int32)
+        available = rng.integers(0, 6, size=num_resources, dtype=np.int32)
+        thread_id = int(rng.integers(-1, num_threads))
+        if thread_id >= 0:
+            request = rng.integers(0, need[thread_id] + 1, dtype=np.int32)
+        else:
+            request = np.zeros(num_resources, dtype=np.int32)
+        yield need, allocation, available, thread_id, request
+
+
+def candidate_state(need, allocation, available, thread_id, request):
+    """The state as if thread_id had been granted request."""
+    need, allocation, available = need.copy(), allocation.copy(), available.copy()
+    if thread_id >= 0:
+        need[thread_id] -= request
+        allocation[thread_id] += request
+        available -= request
+    return need, allocation, available
+
+
+def make_banker(need, allocation, available):
+    """BankersAlgorithm over an arbitrary state; __init__ only builds the 3x3 example."""
+    banker = BankersAlgorithm.__new__(BankersAlgorithm)
+    banker.num_threads, banker.num_resources = need.shape
+    banker.need, banker.allocation, banker.available = need, allocation, available
+    banker.max = need + allocation
+    banker._is_safe_specialized = specialize_is_safe(*need.shape)
+    banker._no_request = np.zeros(banker.num_resources, dtype=np.int32)
+    banker._lock = threading.Lock()
+    return banker
+
+
+def expected(state):
+    return reference_is_safe(*(array.tolist() for array in candidate_state(*state)))
+
+
+def kernel_paths():
+    paths = [pytest.param(bankeralgodeadlock._is_safe_kernel, id="kernel")]
+    if bankeralgodeadlock.numba is not None:
+        paths.append(pytest.param(bankeralgodeadlock._is_safe_kernel.py_func, id="kernel-python"))
+    return paths
+
+
+@pytest.mark.parametrize("kernel", kernel_paths())
+def test_kernel_matches_reference(kernel):
+    for state in random_states(1):
+        safe, safe_sequence, count = kernel(*state)
+        assert (bool(safe), safe_sequence[:count].tolist()) == expected(state)
+
+
+@pytest.mark.skipif(bankeralgodeadlock.banker_kernel is None, reason="banker_kernel is not built")
+def test_cython_kernel_matches_reference():
+    for state in random_states(2):
+        assert bankeralgodeadlock.banker_kernel.is_safe_kernel(*state) == expected(state)
+
+
+@pytest.mark.parametrize("method", ["is_safe_heap", "is_safe_scan"])
+def test_numpy_checks_match_reference(method):
+    for state in random_states(3):
+        banker = make_banker(*state[:3])
+        assert getattr(banker, method)(*candidate_state(*state)) == expected(state)
+
+
+def test_specialized_matches_reference():
+    for state in random_states(4):
+        is_safe = specialize_is_safe(*state[0].shape)
+        assert is_safe(*(array.tolist() for array in candidate_state(*state))) == expected(state)
+
+
+def test_is_safe_with_delta_matches_reference():
+    for state in random_states(5):
+        banker = make_banker(*state[:3])
+        assert banker._is_safe_with_delta(*state[3:]) == expected(state)
+
+
+def test_is_safe_on_example_shapes():
+    for num_threads in range(1, 4):
+        for num_resources in range(1, 4):
+            banker = BankersAlgorithm(num_resources, num_threads)
+            assert banker.need.shape == (num_threads, num_resources)
+            need, allocation, available = banker.need.tolist(), banker.allocation.tolist(), banker.available.tolist()
+            assert banker.is_safe() == reference_is_safe(need, allocation, available)